@@ -33,6 +33,7 @@ from enum import Enum
 from decimal import Decimal
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select, update, delete, func, text
 
 logger = logging.getLogger("flask.app")
 
@@ -40,6 +41,12 @@ logger = logging.getLogger("flask.app")
 db = SQLAlchemy()
 
 
+# Columns read by Product.serialize()
+_SERIALIZED_FIELDS = frozenset(
+    ("id", "name", "description", "price", "available", "category")
+)
+
+
 def init_db(app):
     """Initialize the SQLAlchemy app"""
     Product.init_db(app)
@@ -72,13 +79,24 @@ class Product(db.Model):
     # Table Schema
     ##################################################
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     description = db.Column(db.String(250), nullable=False)
-    price = db.Column(db.Numeric, nullable=False)
-    available = db.Column(db.Boolean(), nullable=False, default=True)
+    price = db.Column(db.Numeric, nullable=False, index=True)
+    available = db.Column(db.Boolean(), nullable=False, default=True, index=True)
     category = db.Column(
         db.Enum(Category), nullable=False, server_default=(Category.UNKNOWN.name)
     )
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
+    )
+
+    # category lookups use the leading column of this composite index
+    __table_args__ = (
+        db.Index("ix_product_category_available", "category", "available"),
+    )
 
     ##################################################
     # INSTANCE METHODS
@@ -114,15 +132,29 @@ class Product(db.Model):
 
     def serialize(self) -> dict:
         """Serializes a Product into a dictionary"""
+        # read loaded values straight from the instance dict to skip the
+        # attribute descriptors, falling back to them for expired attributes
+        values = self.__dict__
+        if not values.keys() >= _SERIALIZED_FIELDS:
+            values = {field: getattr(self, field) for field in _SERIALIZED_FIELDS}
+        return self.serialize_row(values)
+
+    @staticmethod
+    def serialize_row(row) -> dict:
+        """Serializes a mapping of Product column values into a dictionary"""
         return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "price": str(self.price),
-            "available": self.available,
-            "category": self.category.name  # convert enum to string
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "price": str(row["price"]),
+            "available": row["available"],
+            "category": row["category"].name  # convert enum to string
         }
 
+    def etag(self) -> str:
+        """Returns an unquoted entity tag that changes whenever the Product is updated"""
+        return f"{self.id}-{self.updated_at.timestamp()}"
+
     def deserialize(self, data: dict):
         """
         Deserializes a Product from a dictionary
@@ -168,6 +200,27 @@ class Product(db.Model):
         db.init_app(app)
         app.app_context().push()
         db.create_all()  # make our sqlalchemy tables
+        cls.upgrade_schema()
+
+    @classmethod
+    def upgrade_schema(cls):
+        """Brings a product table created by an earlier version up to date
+
+        db.create_all() never alters a table that already exists, so the
+        columns and indexes added since then are added here. Every statement
+        is a no-op when the table is already current.
+        """
+        logger.info("Upgrading database schema")
+        db.session.execute(
+            text(
+                "ALTER TABLE product ADD COLUMN IF NOT EXISTS updated_at "
+                "timestamptz NOT NULL DEFAULT clock_timestamp()"
+            )
+        )
+        connection = db.session.connection()
+        for index in cls.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        db.session.commit()
 
     @classmethod
     def all(cls) -> list:
@@ -175,6 +228,25 @@ class Product(db.Model):
         logger.info("Processing all Products")
         return cls.query.all()
 
+    @classmethod
+    def list_rows(cls, filter_clause=None):
+        """Returns the column values of Products without loading model instances
+
+        :param filter_clause: an optional SQL expression to filter the Products by
+        :type filter_clause: ColumnElement
+
+        :return: a streamed result of Product column mappings
+        :rtype: MappingResult
+
+        """
+        logger.info("Processing Product rows query ...")
+        statement = select(
+            cls.id, cls.name, cls.description, cls.price, cls.available, cls.category
+        )
+        if filter_clause is not None:
+            statement = statement.where(filter_clause)
+        return db.session.execute(statement.execution_options(yield_per=500)).mappings()
+
     @classmethod
     def find(cls, product_id: int):
         """Finds a Product by it's ID
@@ -187,7 +259,57 @@ class Product(db.Model):
 
         """
         logger.info("Processing lookup for id %s ...", product_id)
-        return cls.query.get(product_id)
+        return db.session.get(cls, product_id)
+
+    @classmethod
+    def update_by_id(cls, product_id: int, data: dict):
+        """Updates a Product by it's ID with a single UPDATE statement
+
+        :param product_id: the id of the Product to update
+        :type product_id: int
+        :param data: a dictionary containing the Product data
+        :type data: dict
+
+        :return: the validated Product that was saved, or None if not found
+        :rtype: Product
+
+        """
+        logger.info("Processing update for id %s ...", product_id)
+        # validate the data on a transient Product before touching the database
+        product = cls().deserialize(data)
+        statement = (
+            update(cls)
+            .where(cls.id == product_id)
+            .values(
+                name=product.name,
+                description=product.description,
+                price=product.price,
+                available=product.available,
+                category=product.category,
+            )
+        )
+        result = db.session.execute(statement)
+        db.session.commit()
+        if result.rowcount == 0:
+            return None
+        product.id = product_id
+        return product
+
+    @classmethod
+    def delete_by_id(cls, product_id: int) -> int:
+        """Removes a Product by it's ID with a single DELETE statement
+
+        :param product_id: the id of the Product to delete
+        :type product_id: int
+
+        :return: the number of Products that were deleted
+        :rtype: int
+
+        """
+        logger.info("Processing delete for id %s ...", product_id)
+        result = db.session.execute(delete(cls).where(cls.id == product_id))
+        db.session.commit()
+        return result.rowcount
 
     @classmethod
     def find_by_name(cls, name: str) -> list:
@@ -18,12 +18,21 @@
 """
 Product Store Service with UI
 """
-from flask import jsonify, request, abort
-from flask import url_for  # noqa: F401 pylint: disable=unused-import
+import orjson
+from flask import jsonify, request, abort, stream_with_context
 from service.models import Product, Category, DataValidationError
 from service.common import status  # HTTP Status Codes
 from . import app
 
+# Maps both the enum names and their integer values (as strings) to a Category
+_CATEGORY_LOOKUP = {
+    **{category.name: category for category in Category},
+    **{str(category.value): category for category in Category},
+}
+
+# Query string values that are treated as True for the available filter
+_TRUE_VALUES = frozenset({"true", "True", "TRUE", "1", "yes"})
+
 
 ######################################################################
 # H E A L T H   C H E C K
@@ -48,17 +57,14 @@ def index():
 ######################################################################
 def check_content_type(content_type):
     """Checks that the media type is correct"""
-    if "Content-Type" not in request.headers:
-        app.logger.error("No Content-Type specified.")
-        abort(
-            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            f"Content-Type must be {content_type}",
-        )
-
-    if request.headers["Content-Type"] == content_type:
+    # mimetype is parsed by Werkzeug without parameters such as charset
+    if request.mimetype == content_type:
         return
 
-    app.logger.error("Invalid Content-Type: %s", request.headers["Content-Type"])
+    if not request.mimetype:
+        app.logger.error("No Content-Type specified.")
+    else:
+        app.logger.error("Invalid Content-Type: %s", request.content_type)
     abort(
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         f"Content-Type must be {content_type}",
@@ -74,11 +80,11 @@ def create_products():
     Creates a Product
     This endpoint will create a Product based the data in the body that is posted
     """
-    app.logger.info("Request to Create a Product...")
+    app.logger.debug("Request to Create a Product...")
     check_content_type("application/json")
 
     data = request.get_json()
-    app.logger.info("Processing: %s", data)
+    app.logger.debug("Processing: %s", data)
     product = Product()
     product.deserialize(data)
     product.create()
@@ -86,7 +92,8 @@ def create_products():
 
     message = product.serialize()
 
-    location_url = url_for("get_products", product_id=product.id, _external=True)
+    # build the location directly instead of walking the URL map with url_for
+    location_url = f"{request.url_root}products/{product.id}"
     return jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
 
 
@@ -100,83 +107,89 @@ def list_products():
     Get all Products
     This endpoint will get al Products and can be filtered by name, category, availability or price
     """
-    app.logger.info("Request to Read a Product...")
+    app.logger.debug("Request to List Products...")
 
     name = request.args.get("name")
     category = request.args.get("category")
     available = request.args.get("available")
+    filter_clause = None
     if name is not None:
-        products = Product.find_by_name(name)
+        filter_clause = Product.name == name
     elif category is not None:
-        try:
-            category = Category(int(category))
-        except ValueError:
-            category = Category[category.upper()]
-        products = Product.find_by_category(category)
+        category_value = _CATEGORY_LOOKUP.get(category) or _CATEGORY_LOOKUP.get(category.upper())
+        if category_value is None:
+            return jsonify({"message": f"Invalid category: {category}"}), status.HTTP_400_BAD_REQUEST
+        filter_clause = Product.category == category_value
     elif available is not None:
-        app.logger.info(f"Availability: {available}")
-        products = Product.find_by_availability(available in [True, 'True', 'true'])
-    else:
-        products = Product.all()
-
-    def mapper(product):
-        return product.serialize()
-
-    message = list(map(mapper, products))
-
-    #
-    # Uncomment this line of code once you implement READ A PRODUCT
-    #
-    return jsonify(message), status.HTTP_200_OK
+        app.logger.info("Availability: %s", available)
+        filter_clause = Product.available == (available in _TRUE_VALUES)
+    rows = Product.list_rows(filter_clause)
+
+    def generate():
+        # Stream rows from a server-side cursor one product at a time
+        yield b"["
+        first = True
+        for row in rows:
+            if not first:
+                yield b","
+            yield orjson.dumps(Product.serialize_row(row))
+            first = False
+        yield b"]"
+
+    return (
+        app.response_class(stream_with_context(generate()), mimetype="application/json"),
+        status.HTTP_200_OK,
+    )
 
 ######################################################################
 # R E A D   A   P R O D U C T
 ######################################################################
 
 
-@app.route("/products/<product_id>",  methods=["GET"])
+@app.route("/products/<int:product_id>",  methods=["GET"])
 def get_products(product_id):
     """
     Get a Product by id
     This endpoint will get a Product by the given product id
     """
-    app.logger.info("Request to Read a Product...")
+    app.logger.debug("Request to Read a Product...")
 
     product = Product.find(product_id)
     if product is None:
         return jsonify({"message": f"Product with id {product_id} not found."}), status.HTTP_404_NOT_FOUND
 
-    message = product.serialize()
-
-    #
-    # Uncomment this line of code once you implement READ A PRODUCT
-    #
-    return jsonify(message), status.HTTP_200_OK
+    # skip serializing when the client already has the current version
+    etag = product.etag()
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = jsonify(product.serialize())
+    response.set_etag(etag, weak=True)
+    return response
 
 ######################################################################
 # U P D A T E   A   P R O D U C T
 ######################################################################
 
 
-@app.route("/products/<product_id>", methods=["PUT"])
+@app.route("/products/<int:product_id>", methods=["PUT"])
 def update_products(product_id):
     """
     Update a Product by id
     This endpoint will update a Product by the given product id
     """
-    app.logger.info("Request to Read a Product...")
+    app.logger.debug("Request to Update a Product...")
     check_content_type("application/json")
 
-    product = Product.find(product_id)
-    if product is None:
-        return jsonify({"message": f"Product with id {product_id} not found."}), status.HTTP_404_NOT_FOUND
-
+    data = request.get_json()
     try:
-        product.deserialize(request.get_json())
+        product = Product.update_by_id(product_id, data)
     except DataValidationError as error:
         return jsonify({"message": str(error)}), status.HTTP_400_BAD_REQUEST
 
-    product.update()
+    if product is None:
+        return jsonify({"message": f"Product with id {product_id} not found."}), status.HTTP_404_NOT_FOUND
+
     message = product.serialize()
     #
     # Uncomment this line of code once you implement READ A PRODUCT
@@ -188,19 +201,17 @@ def update_products(product_id):
 ######################################################################
 
 
-@app.route("/products/<product_id>", methods=["DELETE"])
+@app.route("/products/<int:product_id>", methods=["DELETE"])
 def delete_products(product_id):
     """
     Delete a Product by id
     This endpoint will delete a Product by the given product id
     """
-    app.logger.info("Request to Read a Product...")
+    app.logger.debug("Request to Delete a Product...")
 
-    product = Product.find(product_id)
-    if product is None:
+    if Product.delete_by_id(product_id) == 0:
         return jsonify({"message": f"Product with id {product_id} not found."}), status.HTTP_404_NOT_FOUND
 
-    product.delete()
     #
     # Uncomment this line of code once you implement READ A PRODUCT
     #
@@ -19,7 +19,7 @@ Test Factory to make fake objects for testing
 """
 import factory
 from factory.fuzzy import FuzzyChoice, FuzzyDecimal
-from service.models import Product, Category
+from service.models import Product, Category, db
 
 
 class ProductFactory(factory.Factory):
@@ -49,3 +49,11 @@ class ProductFactory(factory.Factory):
     price = FuzzyDecimal(0.5, 2000.0, 2)
     available = FuzzyChoice(choices=[True, False])
     category = FuzzyChoice(choices=Category)
+
+
+def bulk_create_products(count: int = 1) -> list:
+    """Inserts fake products into the database with a single commit"""
+    products = ProductFactory.build_batch(count, id=None)
+    db.session.bulk_save_objects(products, return_defaults=True)
+    db.session.commit()
+    return products
@@ -0,0 +1,50 @@
+# unittest hook names are camelCase
+# pylint: disable=invalid-name
+
+"""
+Test mixin that rolls back the database changes made by each test
+"""
+from sqlalchemy.orm import scoped_session, sessionmaker
+from service.models import db
+
+
+class TransactionalTestMixin:
+    """Runs each test inside a SAVEPOINT that is rolled back afterwards
+
+    All of the tests in a class share one connection and one outer
+    transaction. db.session is bound to that connection with
+    join_transaction_mode="create_savepoint", so the commits made by the
+    code under test only release nested savepoints.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Opens the connection and outer transaction shared by the tests"""
+        super().setUpClass()
+        cls.app_session = db.session
+        cls.connection = db.engine.connect()
+        cls.trans = cls.connection.begin()
+        db.session = scoped_session(
+            sessionmaker(bind=cls.connection, join_transaction_mode="create_savepoint")
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Rolls back the outer transaction and restores the app session"""
+        db.session.remove()
+        cls.trans.rollback()
+        cls.connection.close()
+        db.session = cls.app_session
+        db.session.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Starts the savepoint for this test"""
+        super().setUp()
+        self.nested = self.connection.begin_nested()
+
+    def tearDown(self):
+        """Rolls back everything this test wrote"""
+        db.session.remove()
+        self.nested.rollback()
+        super().tearDown()